@@ -0,0 +1,33 @@
+import base64
+import hmac
+import os
+
+import orjson
+from fastapi import Request, Response
+
+# Credenciales de la API (Basic Auth HTTP)
+API_USERNAME = os.getenv("API_USERNAME", "admin")
+API_PASSWORD = os.getenv("API_PASSWORD", "adminpass")
+
+# Header Authorization esperado, precomputado una sola vez en bytes
+_EXPECTED_AUTH = b"Basic " + base64.b64encode(f"{API_USERNAME}:{API_PASSWORD}".encode())
+
+_UNAUTHORIZED_BODY = orjson.dumps({"detail": "Credenciales inválidas"})
+
+# Prefijos de rutas protegidas: el middleware resuelve la autenticación acá,
+# sin pasar por la inyección de dependencias de FastAPI en cada request
+PROTECTED_PREFIXES = ("/hiv/", "/agente_sustitutor", "/admin/")
+
+
+async def basic_auth_middleware(request: Request, call_next):
+    """Basic Auth como middleware ASGI: una sola comparación en tiempo constante del header completo"""
+    if request.url.path.startswith(PROTECTED_PREFIXES):
+        header = request.headers.get("Authorization", "")
+        if not hmac.compare_digest(header.encode("latin-1"), _EXPECTED_AUTH):
+            return Response(
+                content=_UNAUTHORIZED_BODY,
+                status_code=401,
+                media_type="application/json",
+                headers={"WWW-Authenticate": "Basic"},
+            )
+    return await call_next(request)
@@ -0,0 +1,121 @@
+import asyncio
+import os
+from typing import Optional
+
+import psycopg_pool
+
+# Datos de la base (IBM Cloud PostgreSQL)
+DB_HOST = os.getenv("DB_HOST")
+DB_PORT = os.getenv("DB_PORT", "5432")
+DB_NAME = os.getenv("DB_NAME")
+DB_USER = os.getenv("DB_USER")
+DB_PASS = os.getenv("DB_PASS")
+DB_SSLMODE = os.getenv("DB_SSLMODE", "require")
+
+# Umbral de prepared statements de psycopg3. Si DB_HOST apunta a un pgbouncer
+# en pool_mode=transaction anterior a 1.21 (sin soporte de prepared statements
+# a nivel protocolo), setear DB_PREPARE_THRESHOLD=off
+_prepare_env = os.getenv("DB_PREPARE_THRESHOLD", "1")
+DB_PREPARE_THRESHOLD = None if _prepare_env.lower() == "off" else int(_prepare_env)
+
+# Pool asíncrono de conexiones a PostgreSQL (se abre en startup())
+pool: Optional[psycopg_pool.AsyncConnectionPool] = None
+
+# Tablas de referencia materializadas en memoria, precargadas al inicio y
+# refrescadas en background: el check HIV es un probe de frozenset y la
+# sustitución un get de dict, sin I/O de red en el camino caliente
+hiv_set: frozenset = frozenset()
+sust_map: dict = {}
+REFDATA_REFRESH_SECONDS = int(os.getenv("REFDATA_REFRESH_SECONDS", "300"))
+_refdata_refresh_task: Optional[asyncio.Task] = None
+
+# Índices para que los lookups por igualdad sean un probe de B-tree
+# en vez de un sequential scan
+INDEX_DDL = (
+    'CREATE INDEX IF NOT EXISTS idx_medhiv_present ON public."medicamentos_HIV.csv" ("Presentacion")',
+    'CREATE INDEX IF NOT EXISTS idx_sust_codigo ON public.tablasustitucion_hiv ("codigo")',
+)
+
+
+async def ensure_indexes():
+    """Crea los índices de lookup si no existen (no bloquea el arranque si el usuario de base no tiene permisos de DDL)"""
+    try:
+        async with pool.connection() as conn:
+            # Modo pipeline: ambos statements viajan en un solo round-trip
+            async with conn.pipeline():
+                for ddl in INDEX_DDL:
+                    await conn.execute(ddl)
+    except Exception:
+        pass
+
+
+async def load_refdata():
+    """Carga las tablas de referencia (medicamentos HIV y sustitución) desde la base"""
+    global hiv_set, sust_map
+    async with pool.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute('SELECT "Presentacion" FROM public."medicamentos_HIV.csv"')
+            hiv_rows = await cur.fetchall()
+            await cur.execute(
+                'SELECT "codigo", "sustituye", "codigoSustituible" FROM public.tablasustitucion_hiv'
+            )
+            sust_rows = await cur.fetchall()
+    hiv_set = frozenset(str(r[0]) for r in hiv_rows)
+    sust_map = {str(row[0]): row for row in sust_rows}
+
+
+async def _refresh_refdata():
+    """Refresca periódicamente las tablas; ante un error conserva la última copia"""
+    while True:
+        await asyncio.sleep(REFDATA_REFRESH_SECONDS)
+        try:
+            await load_refdata()
+        except Exception:
+            pass
+
+
+def _conninfo() -> str:
+    """Valida las variables de entorno una sola vez (al arrancar) y arma el DSN"""
+    missing = [
+        name for name, value in (
+            ("DB_HOST", DB_HOST),
+            ("DB_NAME", DB_NAME),
+            ("DB_USER", DB_USER),
+            ("DB_PASS", DB_PASS),
+        ) if not value
+    ]
+    if missing:
+        raise RuntimeError(
+            f"Faltan variables de entorno de base de datos: {', '.join(missing)}"
+        )
+    return (
+        f"host={DB_HOST} port={DB_PORT} dbname={DB_NAME} "
+        f"user={DB_USER} password={DB_PASS} sslmode={DB_SSLMODE}"
+    )
+
+
+async def startup():
+    """Abre el pool, asegura índices y precarga las tablas de referencia"""
+    global pool, _refdata_refresh_task
+    conninfo = _conninfo()
+    # prepare_threshold=1: psycopg3 prepara los statements repetidos desde el
+    # primer uso por conexión, evitando re-parsear/re-planear la query caliente
+    pool = psycopg_pool.AsyncConnectionPool(
+        conninfo,
+        min_size=4,
+        max_size=20,
+        open=False,
+        kwargs={"prepare_threshold": DB_PREPARE_THRESHOLD},
+    )
+    await pool.open()
+    await ensure_indexes()
+    await load_refdata()
+    _refdata_refresh_task = asyncio.create_task(_refresh_refdata())
+
+
+async def shutdown():
+    """Cancela el refresh y cierra todas las conexiones del pool"""
+    if _refdata_refresh_task is not None:
+        _refdata_refresh_task.cancel()
+    if pool is not None:
+        await pool.close()
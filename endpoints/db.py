@@ -0,0 +1,63 @@
+from fastapi import APIRouter, HTTPException, Query
+
+import database
+from models import HIVCheckResponse, SustitucionResponse
+
+# La autenticación de estas rutas la resuelve auth.basic_auth_middleware
+router = APIRouter()
+
+# Presentaciones que se consideran HIV por regla de negocio aunque no figuren
+# en la tabla; frozenset para que el bypass siga siendo O(1) cuando crezca
+_BYPASS_HIV = frozenset({"23523"})
+
+
+@router.get("/hiv/check", response_model=HIVCheckResponse)
+async def check_hiv_medication(presentacion: str):
+    """
+    Verifica si una presentación corresponde a un medicamento HIV.
+    presentacion: el valor que se consulta en "Presentacion" (ej: '18000')
+    """
+    return HIVCheckResponse(
+        presentacion=presentacion,
+        es_hiv=presentacion in _BYPASS_HIV or presentacion in database.hiv_set
+    )
+
+
+@router.get("/agente_sustitutor", response_model=SustitucionResponse)
+async def agente_sustitutor(
+    troquel: str = Query(..., description="Código de troquel del medicamento")
+):
+    """
+    Verifica si un medicamento es sustituible por otro según la tabla de sustitución HIV.
+    - Si sustituye = 1: El medicamento es sustituible, retorna el código sustituto
+    - Si sustituye = 0: El medicamento no es sustituible
+    """
+    row = database.sust_map.get(troquel)
+    if row is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Troquel '{troquel}' no encontrado en la tabla de sustitución"
+        )
+    codigo_original, sustituye, codigo_sustituible = row
+    if sustituye == 1:
+        return SustitucionResponse(
+            troquel=troquel,
+            codigo_original=str(codigo_original),
+            es_sustituible=True,
+            mensaje=f"El medicamento es sustituible. Código original '{codigo_original}' se sustituye por '{codigo_sustituible}'",
+            codigo_sustituto=str(codigo_sustituible) if codigo_sustituible else None
+        )
+    else:
+        return SustitucionResponse(
+            troquel=troquel,
+            codigo_original=str(codigo_original),
+            es_sustituible=False,
+            mensaje=f"El medicamento con código '{codigo_original}' no es sustituible"
+        )
+
+
+@router.post("/admin/cache/clear")
+async def clear_cache():
+    """Recarga las tablas de referencia en memoria (usar tras actualizar los datos)"""
+    await database.load_refdata()
+    return {"status": "ok"}
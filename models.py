@@ -0,0 +1,53 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict
+
+
+# Sin json_encoders custom: FechaEntrada se serializa como datetime nativo
+# por orjson (default_response_class de la app)
+class Ticket(BaseModel):
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
+    ObjectID: str
+    Filial: str
+    Socio: str
+    ID: str
+    FechaEntrada: datetime
+
+
+class Coding(BaseModel):
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
+    system: str
+    code: str
+
+class Receta(BaseModel):
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
+    Troquel: str
+    Codigo: str
+    monodroga: str
+    descripcion: str
+
+class TicketRecetasResponse(BaseModel):
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
+    id_socio: str
+    ticket_id: str
+    recetas: list[Receta]
+
+class HIVCheckResponse(BaseModel):
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
+    presentacion: str
+    es_hiv: bool
+
+class SustitucionResponse(BaseModel):
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
+    troquel: str
+    codigo_original: str
+    es_sustituible: bool
+    mensaje: str
+    codigo_sustituto: Optional[str] = None